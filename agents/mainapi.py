@@ -3,9 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
 import pandas as pd
+import logging
 import os
 import sys
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from supabase import create_client
 from dotenv import load_dotenv
 
@@ -18,6 +19,8 @@ supabase = create_client(
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from agents.recovery import compute_recovery
+from agents.training_load import compute_training_load, add_training_columns
+from agents.percentiles import KLLSketch, percentile_rank
 from agents.pattern import detect_patterns
 from agents.coach import generate_coaching, generate_workout_plan, generate_experiment
 
@@ -107,12 +110,14 @@ def get_user(user_id: str):
 def create_daily_log(log: DailyLog):
     data = log.dict()
     result = supabase.table("daily_logs").insert(data).execute()
+    _update_sketches([data])
     return {"success": True, "data": result.data}
 
 @app.post("/api/daily_logs/bulk")
 def bulk_create_logs(logs: List[DailyLog]):
     data = [log.dict() for log in logs]
     result = supabase.table("daily_logs").insert(data).execute()
+    _update_sketches(data)
     return {"success": True, "count": len(result.data)}
 
 @app.get("/api/daily_logs/{user_id}")
@@ -129,18 +134,25 @@ def get_baseline(user_id: str):
         raise HTTPException(status_code=404, detail="No baseline found")
     return result.data[0]
 
+@app.post("/api/baselines/compute")
+def compute_all_baselines():
+    """Recompute baselines for every user in a single database call."""
+    result = supabase.rpc("refresh_baselines").execute()
+    return {"success": True, "count": result.data}
+
 @app.post("/api/baselines/{user_id}/compute")
 def compute_baseline(user_id: str):
     """Compute and save baseline from daily logs."""
-    logs = supabase.table("daily_logs").select("*").eq("user_id", user_id).order("date", desc=True).limit(14).execute()
+    # Medians over the last 14 days are aggregated in Postgres (baseline_stats view)
+    stats = supabase.table("baseline_stats").select("*").eq("user_id", user_id).execute()
     
-    if not logs.data or len(logs.data) < 7:
+    if not stats.data or stats.data[0]["n_days"] < 7:
         raise HTTPException(status_code=400, detail="Need at least 7 days of data")
     
-    df = pd.DataFrame(logs.data)
-    avg_hrv = df['hrv'].median()
-    avg_rhr = df['rhr'].median()
-    avg_sleep = df['sleep_hrs'].median()
+    row = stats.data[0]
+    avg_hrv = row["avg_hrv"]
+    avg_rhr = row["avg_rhr"]
+    avg_sleep = row["avg_sleep"]
     
     # Upsert baseline
     supabase.table("baselines").upsert({
@@ -167,9 +179,133 @@ def get_recovery(user_id: str):
     df = df.rename(columns={'hrv': 'hrv', 'sleep_hrs': 'sleep_hours'})
     df = df.sort_values('date')
     
-    recovery = compute_recovery(df)
+    # Fetch a second chronic window before as_of so compute_training_load can tell new users apart
+    as_of = df['date'].iloc[-1]
+    training_load = compute_training_load(_get_daily_training(user_id, as_of, days=56), as_of)
+    recovery = compute_recovery(df, training_load)
+    
+    today = df.iloc[-1]
+    recovery["percentiles"] = get_percentiles(user_id, {
+        "hrv": today["hrv"],
+        "rhr": today["rhr"],
+        "sleep_hrs": today["sleep_hours"]
+    })
     return recovery
 
+# ============ PERCENTILES ============
+
+SKETCH_METRICS = ["hrv", "rhr", "sleep_hrs"]
+
+logger = logging.getLogger(__name__)
+
+def _load_sketches(cohorts: List[str]):
+    result = supabase.table("metric_sketches").select("*").in_("cohort", cohorts).execute()
+    return {(row["cohort"], row["metric"]): KLLSketch.from_dict(row["sketch"]) for row in result.data}
+
+def _save_sketches(sketches: dict):
+    rows = [{
+        "cohort": cohort,
+        "metric": metric,
+        "n": sketch.n,
+        "sketch": sketch.to_dict(),
+        "updated_at": datetime.now().isoformat()
+    } for (cohort, metric), sketch in sketches.items()]
+    if rows:
+        supabase.table("metric_sketches").upsert(rows, on_conflict="cohort,metric").execute()
+
+def _add_to_sketches(sketches: dict, logs: List[dict]):
+    for log in logs:
+        for metric in SKETCH_METRICS:
+            sketches.setdefault((f"user:{log['user_id']}", metric), KLLSketch()).update(log.get(metric))
+
+def _empty_population():
+    return {("all", metric): KLLSketch() for metric in SKETCH_METRICS}
+
+def _fold_into_population(population: dict, sketches: dict):
+    """Merge per-user sketches into the population ('all') sketches."""
+    for (cohort, metric), sketch in sketches.items():
+        if cohort.startswith("user:") and metric in SKETCH_METRICS:
+            population[("all", metric)].merge(sketch)
+
+def _update_sketches(logs: List[dict]):
+    """Fold newly ingested daily logs into the users' personal sketches.
+    
+    Best-effort: the daily_logs rows are already committed, so a failure here is
+    logged rather than failing the request. The sketch is read, updated in Python and
+    written back without a lock, so concurrent ingests for the same user (or a
+    /rebuild running meanwhile) can drop values; /api/percentiles/rebuild restores
+    exact sketches from daily_logs. Only per-user rows are written here; 'all' is
+    rebuilt by /api/percentiles/merge.
+    """
+    try:
+        cohorts = list({f"user:{log['user_id']}" for log in logs})
+        sketches = _load_sketches(cohorts)
+        _add_to_sketches(sketches, logs)
+        _save_sketches(sketches)
+    except Exception:
+        logger.exception("Failed to update metric sketches for %d daily logs", len(logs))
+
+def get_percentiles(user_id: str, values: dict):
+    """Percentile rank of each value vs the population and the user's own history."""
+    sketches = _load_sketches(["all", f"user:{user_id}"])
+    return {
+        metric: {
+            "population": percentile_rank(sketches.get(("all", metric)), value),
+            "personal": percentile_rank(sketches.get((f"user:{user_id}", metric)), value)
+        }
+        for metric, value in values.items()
+    }
+
+@app.post("/api/percentiles/merge")
+def merge_percentiles(page_size: int = 1000):
+    """Rebuild the population sketches from all personal sketches (run on a schedule)."""
+    population = _empty_population()
+    users = 0
+    start = 0
+    while True:
+        page = supabase.table("metric_sketches").select("*").like("cohort", "user:%").order("cohort").order("metric").range(start, start + page_size - 1).execute()
+        # Fold each page in as it arrives; only the three population sketches stay in memory
+        for row in page.data:
+            if row["metric"] in SKETCH_METRICS:
+                population[("all", row["metric"])].merge(KLLSketch.from_dict(row["sketch"]))
+        users += sum(1 for row in page.data if row["metric"] == "hrv")
+        if len(page.data) < page_size:
+            break
+        start += page_size
+    _save_sketches(population)
+    return {"success": True, "users": users, "n": population[("all", "hrv")].n}
+
+@app.post("/api/percentiles/rebuild")
+def rebuild_percentiles(page_size: int = 1000):
+    """Rebuild every sketch from a full scan of daily_logs."""
+    population = _empty_population()
+    current = {}
+    current_user = None
+    users = 0
+    start = 0
+    while True:
+        page = supabase.table("daily_logs").select("user_id, hrv, rhr, sleep_hrs").order("user_id").order("date").range(start, start + page_size - 1).execute()
+        # Rows are ordered by user_id, so a user is done once the next one starts;
+        # save finished users once per page and keep only the current one in memory
+        finished = {}
+        for log in page.data:
+            if log["user_id"] != current_user:
+                finished.update(current)
+                current = {}
+                current_user = log["user_id"]
+                users += 1
+            _add_to_sketches(current, [log])
+        last_page = len(page.data) < page_size
+        if last_page:
+            finished.update(current)
+        _save_sketches(finished)
+        _fold_into_population(population, finished)
+        if last_page:
+            break
+        start += page_size
+    _save_sketches(population)
+    return {"success": True, "users": users}
+
 # ============ PATTERNS ============
 
 @app.get("/api/patterns/{user_id}")
@@ -188,6 +324,9 @@ def get_patterns(user_id: str):
         'rhr': 'resting_hr_bpm'
     })
     
+    # Attach daily training volume from workout rollups (0 on rest days) for detect_patterns
+    df = add_training_columns(df, _get_daily_training(user_id, df['date'].max(), days=60))
+    
     patterns = detect_patterns(df)
     return {"user_id": user_id, "patterns": patterns}
 
@@ -283,6 +422,39 @@ def update_workout(workout_id: str, updates: dict):
     supabase.table("workouts").update(updates).eq("id", workout_id).execute()
     return {"success": True}
 
+# ============ WORKOUT ROLLUPS ============
+
+# workout_summaries is maintained by the workouts trigger (workout_rollups migration),
+# so workouts the app writes straight to Supabase are included.
+
+def _get_daily_training(user_id: str, as_of: str, days: int):
+    """Daily volume/sets rollup for the N days up to as_of as a DataFrame.
+    
+    Rollup days are UTC calendar days (see the workout_rollups migration) and are
+    compared to daily_logs.date as-is, so evening workouts west of UTC count
+    toward the next day.
+    """
+    end = date.fromisoformat(str(as_of)[:10])
+    since = (end - timedelta(days=days)).isoformat()
+    result = supabase.table("workout_volume_daily").select("day, volume, sets").eq("user_id", user_id).gte("day", since).lte("day", end.isoformat()).execute()
+    return pd.DataFrame(result.data, columns=["day", "volume", "sets"])
+
+@app.get("/api/workout_rollups/{user_id}")
+def get_workout_rollups(user_id: str, weeks: int = 8):
+    """Daily/weekly volume, weekly sets per muscle group and per-exercise bests."""
+    since = (date.today() - timedelta(weeks=weeks)).isoformat()
+    daily = supabase.table("workout_volume_daily").select("*").eq("user_id", user_id).gte("day", since).order("day").execute()
+    weekly = supabase.table("workout_volume_weekly").select("*").eq("user_id", user_id).gte("week", since).order("week").execute()
+    muscles = supabase.table("muscle_sets_weekly").select("*").eq("user_id", user_id).gte("week", since).order("week").execute()
+    bests = supabase.table("exercise_bests").select("*").eq("user_id", user_id).execute()
+    return {
+        "user_id": user_id,
+        "daily": daily.data,
+        "weekly": weekly.data,
+        "muscle_sets": muscles.data,
+        "exercise_bests": bests.data
+    }
+
 # ============ WORKOUT TEMPLATES ============
 
 @app.post("/api/workout_templates")
@@ -0,0 +1,129 @@
+import math
+import random
+from bisect import bisect_right
+
+# Population Percentiles (mergeable KLL quantile sketch)
+
+_rng = random.Random()
+
+
+class KLLSketch:
+    """
+    Streaming quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Keeps a bounded number of items (about 3 * k for c=2/3) no matter
+    how many values are added, and two sketches can be merged, so one
+    sketch per metric per cohort is enough to answer percentile ranks.
+    """
+
+    def __init__(self, k: int = 200, c: float = 2 / 3):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.compactors = []
+        self._grow()
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _capacity(self, h: int):
+        depth = len(self.compactors) - h - 1
+        return int(math.ceil(self.k * self.c ** depth)) + 1
+
+    def _size(self):
+        return sum(len(items) for items in self.compactors)
+
+    def _compress(self):
+        """
+        Halve the first full level: sort it and promote every other item
+        (random offset) one level up with double weight.
+        """
+        while self._size() >= self.max_size:
+            for h, items in enumerate(self.compactors):
+                if len(items) < self._capacity(h):
+                    continue
+
+                if h + 1 >= len(self.compactors):
+                    self._grow()
+
+                items.sort()
+                odd = len(items) % 2
+                pairs = items[odd:]
+                self.compactors[h] = items[:odd]
+                self.compactors[h + 1].extend(pairs[_rng.getrandbits(1)::2])
+                break
+
+    def update(self, x: float):
+        if x is None or (isinstance(x, float) and math.isnan(x)):
+            return
+        self.compactors[0].append(float(x))
+        self.n += 1
+        if self._size() >= self.max_size:
+            self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, items in enumerate(other.compactors):
+            self.compactors[h].extend(items)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def rank(self, x: float):
+        """
+        Midrank of x (0.0 - 1.0): fraction of values < x plus half the
+        values == x, so ties (whole-number RHR) sit in the middle of
+        their group instead of at the top.
+        """
+        if self.n == 0:
+            return None
+        below = 0
+        equal = 0
+        for h, items in enumerate(self.compactors):
+            below += (2 ** h) * sum(1 for v in items if v < x)
+            equal += (2 ** h) * sum(1 for v in items if v == x)
+        return (below + equal / 2) / self.n
+
+    def quantile(self, q: float):
+        """
+        Approximate value at quantile q (0.0 - 1.0).
+        """
+        if self.n == 0:
+            return None
+        weighted = sorted(
+            (v, 2 ** h)
+            for h, items in enumerate(self.compactors)
+            for v in items
+        )
+        cumulative = []
+        total = 0
+        for _, w in weighted:
+            total += w
+            cumulative.append(total)
+        i = min(bisect_right(cumulative, q * total), len(weighted) - 1)
+        return weighted[i][0]
+
+    def to_dict(self):
+        # 2 decimals is well below the precision of HRV / RHR / sleep readings
+        levels = [[round(v, 2) for v in items] for items in self.compactors]
+        return {"k": self.k, "c": self.c, "n": self.n, "levels": levels}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        sketch = cls(k=data["k"], c=data["c"])
+        sketch.compactors = [list(items) for items in data["levels"]] or [[]]
+        sketch.max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        sketch.n = data["n"]
+        return sketch
+
+
+def percentile_rank(sketch: KLLSketch, value: float):
+    """
+    Percentile rank (0-100) of value within the sketch, or None if empty.
+    """
+    if sketch is None or value is None or math.isnan(value):
+        return None
+    rank = sketch.rank(value)
+    return round(rank * 100, 1) if rank is not None else None
@@ -24,7 +24,7 @@ def _compute_trend(series: pd.Series, window: int = 5):
     return recent_avg - prev_avg
 
 
-def compute_recovery(df: pd.DataFrame):
+def compute_recovery(df: pd.DataFrame, training_load: dict = None):
     """
     Main recovery entry point.
 
@@ -33,6 +33,9 @@ def compute_recovery(df: pd.DataFrame):
     - hrv        (RMSSD, ms)
     - sleep_hours
 
+    Optional training_load (from training_load.compute_training_load)
+    caps recovery at MODERATE when this week's load spikes.
+
     Returns:
     dict with recovery_state + metrics + reasons
     """
@@ -61,6 +64,10 @@ def compute_recovery(df: pd.DataFrame):
     else:
         recovery_state = "MODERATE"
 
+    load_ratio = training_load.get("load_ratio") if training_load else None
+    if recovery_state == "HIGH" and load_ratio is not None and load_ratio > 1.5:
+        recovery_state = "MODERATE"
+
     # Reasons (for UI / LLM)
     reasons = []
 
@@ -75,10 +82,15 @@ def compute_recovery(df: pd.DataFrame):
     if hrv_trend < 0:
         reasons.append("HRV has been trending down over the last few days")
 
+    if load_ratio is not None and load_ratio > 1.5:
+        reasons.append(
+            f"Training volume this week is {load_ratio:.1f}x your 4-week average"
+        )
+
     if not reasons:
         reasons.append("HRV and sleep are within your normal range")
 
-    return {
+    result = {
         "date": today["date"],
         "recovery_state": recovery_state,
         "today_hrv": round(today_hrv, 1),
@@ -88,3 +100,8 @@ def compute_recovery(df: pd.DataFrame):
         "hrv_trend": round(hrv_trend, 2),
         "reasons": reasons
     }
+
+    if training_load:
+        result["training_load"] = training_load
+
+    return result
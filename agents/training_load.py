@@ -0,0 +1,135 @@
+import math
+import pandas as pd
+
+# Training Load (workout volume rollups + acute/chronic load)
+
+
+def _one_rep_max(weight: float, reps: int):
+    """
+    Epley estimate, same formula (and half-up rounding) as the app's
+    calculateOneRepMax.
+    """
+    if reps <= 1:
+        return weight
+    return math.floor(weight * (1 + reps / 30) + 0.5)
+
+
+def _number(value):
+    """
+    JSON number or 0 (empty strings, "bodyweight", booleans, ...).
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return 0
+
+
+def _items(value, kind):
+    return [v for v in value if isinstance(v, kind)] if isinstance(value, list) else []
+
+
+def summarize_workout(exercises: list):
+    """
+    Parse one workout's exercises JSON into rollup numbers.
+
+    Reference for the summarize_workout_exercises SQL function that the
+    workouts trigger uses to maintain workout_summaries.
+
+    Malformed entries are skipped rather than raising, like the SQL: AI
+    workouts store "sets" as a count, and non-numeric weight / reps count
+    as 0.
+
+    Only completed sets count, matching the progress tab:
+    - volume          sum of weight × reps
+    - sets            number of completed sets
+    - muscle_sets     {muscleGroup: sets}
+    - exercise_bests  {exercise name: {"weight", "e1rm"}}
+    """
+    volume = 0.0
+    sets = 0
+    muscle_sets = {}
+    exercise_bests = {}
+
+    for exercise in _items(exercises, dict):
+        name = exercise.get("name")
+        muscle = exercise.get("muscleGroup")
+
+        for s in _items(exercise.get("sets"), dict):
+            if s.get("completed") is not True:
+                continue
+
+            weight = _number(s.get("weight"))
+            reps = _number(s.get("reps"))
+
+            volume += weight * reps
+            sets += 1
+            if muscle:
+                muscle_sets[muscle] = muscle_sets.get(muscle, 0) + 1
+
+            if name and weight:
+                best = exercise_bests.setdefault(name, {"weight": 0, "e1rm": 0})
+                best["weight"] = max(best["weight"], weight)
+                best["e1rm"] = max(best["e1rm"], _one_rep_max(weight, reps))
+
+    return {
+        "volume": volume,
+        "sets": sets,
+        "muscle_sets": muscle_sets,
+        "exercise_bests": exercise_bests
+    }
+
+
+def compute_training_load(daily: pd.DataFrame, as_of: str, acute: int = 7, chronic: int = 28):
+    """
+    Acute vs chronic training load from daily rollups.
+
+    Required columns:
+    - day
+    - volume
+    - sets
+
+    Rows before the chronic window only serve as history.
+
+    Returns:
+    dict with acute/chronic daily volume and their ratio
+    (ratio is None until there are `chronic` days of history and some
+    training before the acute window, so new users and users coming
+    back from a break aren't flagged as spiking)
+    """
+    end = pd.Timestamp(as_of).normalize()
+    days = pd.date_range(end=end, periods=chronic)
+
+    daily = daily.assign(day=pd.to_datetime(daily["day"]))
+    series = daily.groupby("day")[["volume", "sets"]].sum()
+    series = series.reindex(days, fill_value=0).astype(float)
+
+    acute_volume = series["volume"].tail(acute).mean()
+    chronic_volume = series["volume"].mean()
+
+    has_history = not daily.empty and daily["day"].min() <= end - pd.Timedelta(days=chronic)
+    trained_before = series["volume"].head(chronic - acute).sum() > 0
+
+    load_ratio = None
+    if has_history and trained_before and chronic_volume > 0:
+        load_ratio = acute_volume / chronic_volume
+
+    return {
+        "acute_volume": round(acute_volume, 1),
+        "chronic_volume": round(chronic_volume, 1),
+        "load_ratio": round(load_ratio, 2) if load_ratio is not None else None,
+        "weekly_sets": int(series["sets"].tail(acute).sum())
+    }
+
+
+def add_training_columns(df: pd.DataFrame, daily: pd.DataFrame):
+    """
+    Attach training_volume / training_sets to daily logs by date
+    (0 on rest days).
+    """
+    training = daily.assign(date=pd.to_datetime(daily["day"]).dt.strftime("%Y-%m-%d")).rename(columns={
+        "volume": "training_volume",
+        "sets": "training_sets"
+    })
+    df = df.assign(date=df["date"].astype(str).str[:10])
+    df = df.merge(training[["date", "training_volume", "training_sets"]], on="date", how="left")
+    df[["training_volume", "training_sets"]] = df[["training_volume", "training_sets"]].fillna(0)
+    return df
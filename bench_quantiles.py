@@ -0,0 +1,80 @@
+import json
+import random
+import time
+from bisect import bisect_left, bisect_right
+
+from agents.percentiles import KLLSketch
+
+# Accuracy + throughput of KLLSketch vs exact percentiles (sorted list)
+
+N = 200_000
+SHARDS = 10
+random.seed(7)
+
+# HRV-like values (ms), right skewed
+values = [random.lognormvariate(3.9, 0.35) for _ in range(N)]
+
+# Exact
+start = time.perf_counter()
+exact = sorted(values)
+exact_secs = time.perf_counter() - start
+
+# Sketch, single stream
+sketch = KLLSketch()
+start = time.perf_counter()
+for v in values:
+    sketch.update(v)
+update_secs = time.perf_counter() - start
+
+# Sketch, merged from shards (e.g. per-user sketches rolled into a cohort)
+shards = [KLLSketch() for _ in range(SHARDS)]
+for i, v in enumerate(values):
+    shards[i % SHARDS].update(v)
+start = time.perf_counter()
+merged = KLLSketch()
+for shard in shards:
+    merged.merge(shard)
+merge_secs = time.perf_counter() - start
+
+# Population sketch = merge of per-user sketches after a JSON round trip
+# (what /api/percentiles/merge does)
+USERS = 2000
+users = [KLLSketch() for _ in range(USERS)]
+for i, v in enumerate(values):
+    users[i % USERS].update(v)
+stored_users = [json.dumps(u.to_dict()) for u in users]
+start = time.perf_counter()
+population = KLLSketch()
+for row in stored_users:
+    population.merge(KLLSketch.from_dict(json.loads(row)))
+population_secs = time.perf_counter() - start
+
+probes = [exact[int(q * (N - 1))] for q in [i / 100 for i in range(1, 100)]]
+
+
+def exact_midrank(x):
+    return (bisect_left(exact, x) + bisect_right(exact, x)) / 2 / N
+
+
+def max_rank_error(s):
+    return max(abs(s.rank(x) - exact_midrank(x)) for x in probes)
+
+
+start = time.perf_counter()
+for x in probes:
+    sketch.rank(x)
+rank_secs = (time.perf_counter() - start) / len(probes)
+
+stored = sum(len(items) for items in sketch.compactors)
+
+print("\n=== QUANTILE SKETCH BENCHMARK ===")
+print(f"values:            {N}")
+print(f"exact sort:        {exact_secs * 1000:.1f} ms")
+print(f"sketch updates:    {N / update_secs:,.0f} values/s")
+print(f"merge {SHARDS} shards:   {merge_secs * 1000:.1f} ms")
+print(f"rank query:        {rank_secs * 1e6:.0f} us")
+print(f"items stored:      {stored} (exact: {N})")
+print(f"max rank error:    {max_rank_error(sketch) * 100:.2f} pct points (single stream)")
+print(f"max rank error:    {max_rank_error(merged) * 100:.2f} pct points (merged)")
+print(f"merge {USERS} users: {population_secs * 1000:.1f} ms (incl. JSON decode)")
+print(f"max rank error:    {max_rank_error(population) * 100:.2f} pct points ({USERS} users merged)")
@@ -0,0 +1,136 @@
+import math
+import os
+import random
+import sys
+
+import pandas as pd
+import psycopg2
+
+# Compare the old pandas baseline path with baseline_stats / refresh_baselines()
+# Usage: DATABASE_URL=postgresql://... python check_baselines.py
+# Runs inside one transaction on a scratch schema and rolls back at the end.
+
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "supabase", "migrations", "20261019000000_baseline_stats.sql"
+)
+
+random.seed(26)
+
+
+def _logs(user_id, n_days, null_every=0):
+    rows = []
+    for i in range(n_days):
+        hrv = round(random.uniform(35, 90), 1)
+        if null_every and i % null_every == 0:
+            hrv = None
+        rows.append({
+            "user_id": user_id,
+            "date": f"2026-09-{i + 1:02d}",
+            "hrv": hrv,
+            "rhr": float(random.randint(48, 70)),
+            "sleep_hrs": round(random.uniform(4.5, 9.5), 2)
+        })
+    return rows
+
+
+FIXTURE = (
+    _logs("odd", 9)               # odd row count
+    + _logs("even", 10)           # even row count, median interpolates
+    + _logs("nulls", 12, 3)       # NULL hrv on some days
+    + _logs("long", 25)           # more than 14 rows, only latest 14 count
+    + _logs("short", 5)           # below the 7 day minimum
+)
+
+
+def pandas_baseline(rows):
+    """
+    Old compute_baseline: latest 14 rows, pandas median.
+    """
+    recent = sorted(rows, key=lambda r: r["date"], reverse=True)[:14]
+    if len(recent) < 7:
+        return None
+    df = pd.DataFrame(recent)
+    return {
+        "avg_hrv": df["hrv"].median(),
+        "avg_rhr": df["rhr"].median(),
+        "avg_sleep": df["sleep_hrs"].median()
+    }
+
+
+def _same(a, b):
+    return math.isclose(a, b, rel_tol=1e-9)
+
+
+def main():
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    cur = conn.cursor()
+
+    cur.execute("create schema baseline_check")
+    cur.execute("set local search_path = baseline_check")
+    for role in ("anon", "authenticated"):
+        cur.execute(f"""
+            do $$ begin
+                if not exists (select from pg_roles where rolname = '{role}') then
+                    create role {role} nologin;
+                end if;
+            end $$
+        """)
+    cur.execute("""
+        create table daily_logs (
+            user_id text, date date, hrv float8, rhr float8, sleep_hrs float8
+        )
+    """)
+    cur.execute("""
+        create table baselines (
+            user_id text primary key, avg_hrv float8, avg_rhr float8, avg_sleep float8
+        )
+    """)
+    cur.execute(open(MIGRATION).read())
+    cur.executemany(
+        "insert into daily_logs values (%(user_id)s, %(date)s, %(hrv)s, %(rhr)s, %(sleep_hrs)s)",
+        FIXTURE
+    )
+
+    cur.execute("select refresh_baselines()")
+    refreshed = cur.fetchone()[0]
+
+    cur.execute("select user_id, n_days, avg_hrv, avg_rhr, avg_sleep from baseline_stats")
+    view = {r[0]: r[1:] for r in cur.fetchall()}
+    cur.execute("select user_id, avg_hrv, avg_rhr, avg_sleep from baselines")
+    stored = {r[0]: r[1:] for r in cur.fetchall()}
+
+    failures = []
+    users = sorted({r["user_id"] for r in FIXTURE})
+    for user_id in users:
+        expected = pandas_baseline([r for r in FIXTURE if r["user_id"] == user_id])
+        n_days, *from_view = view[user_id]
+
+        if expected is None:
+            if n_days >= 7 or user_id in stored:
+                failures.append(f"{user_id}: should be below the 7 day minimum")
+            continue
+
+        for name, got_view, got_stored in zip(expected, from_view, stored.get(user_id, [None] * 3)):
+            if not _same(expected[name], got_view):
+                failures.append(f"{user_id}.{name}: pandas {expected[name]} vs view {got_view}")
+            if got_stored is None or not _same(expected[name], got_stored):
+                failures.append(f"{user_id}.{name}: pandas {expected[name]} vs baselines {got_stored}")
+
+    if refreshed != len(stored):
+        failures.append(f"refresh_baselines() returned {refreshed}, stored {len(stored)}")
+
+    conn.rollback()
+    conn.close()
+
+    print("\n=== BASELINE CHECK ===")
+    print(f"users: {', '.join(users)}")
+    if failures:
+        for f in failures:
+            print(f"FAIL {f}")
+        sys.exit(1)
+    print("pandas median == baseline_stats == refresh_baselines()")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import json
+import random
+import sys
+from bisect import bisect_left, bisect_right
+
+from agents.percentiles import KLLSketch, percentile_rank
+
+# Checks for agents/percentiles.py against exact midrank percentiles.
+# RHR is stored as whole numbers, so ties are the common case.
+
+N = 100_000
+USERS = 500
+random.seed(28)
+
+
+def exact_percentile(values, x):
+    return (bisect_left(values, x) + bisect_right(values, x)) / 2 / len(values) * 100
+
+
+def check_ties():
+    # Integer RHR 48-70, uniform: 23 distinct values, ~4.3% of rows each
+    values = [random.randint(48, 70) for _ in range(N)]
+    exact = sorted(values)
+
+    sketch = KLLSketch()
+    for v in values:
+        sketch.update(v)
+
+    # Same data as per-user sketches merged after a JSON round trip (/api/percentiles/merge)
+    users = [KLLSketch() for _ in range(USERS)]
+    for i, v in enumerate(values):
+        users[i % USERS].update(v)
+    population = KLLSketch()
+    for user in users:
+        population.merge(KLLSketch.from_dict(json.loads(json.dumps(user.to_dict()))))
+
+    for s in (sketch, population):
+        for x in range(48, 71):
+            got = percentile_rank(s, x)
+            want = exact_percentile(exact, x)
+            assert abs(got - want) < 1.0, (x, got, want)
+
+        # Minimum sits in the middle of its tie group (~2.2), not at its top (~4.3)
+        assert 1.5 < percentile_rank(s, 48) < 3.0, percentile_rank(s, 48)
+        assert 49.0 < percentile_rank(s, 59) < 51.0, percentile_rank(s, 59)
+        # Outside the observed range
+        assert percentile_rank(s, 40) == 0.0 and percentile_rank(s, 80) == 100.0
+
+
+def check_edge_cases():
+    assert percentile_rank(KLLSketch(), 60) is None
+    assert percentile_rank(None, 60) is None
+    assert percentile_rank(KLLSketch(), float("nan")) is None
+
+    one = KLLSketch()
+    one.update(60)
+    assert percentile_rank(one, 60) == 50.0
+
+
+def main():
+    for check in (check_ties, check_edge_cases):
+        check()
+        print(f"ok  {check.__name__}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import math
+import os
+import sys
+
+import pandas as pd
+
+from agents.training_load import summarize_workout, compute_training_load, add_training_columns
+
+# Checks for agents/training_load.py.
+# With DATABASE_URL set, also checks that the workouts trigger
+# (summarize_workout_exercises) matches summarize_workout on the same workouts.
+# The database part runs in a scratch schema and rolls back at the end.
+
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "supabase", "migrations", "20261019010000_workout_rollups.sql"
+)
+
+BENCH = {
+    "name": "Bench Press",
+    "muscleGroup": "Chest",
+    "sets": [
+        {"weight": 100, "reps": 5, "completed": True},
+        {"weight": 110, "reps": 3, "completed": True},
+        {"weight": 200, "reps": 1, "completed": False},
+        {"weight": None, "reps": 10, "completed": True},
+    ]
+}
+PULLUP = {
+    "name": "Pull Up",
+    "muscleGroup": "Back",
+    "sets": [
+        {"reps": 8, "completed": True},
+        {"weight": 25, "reps": 1, "completed": True},
+    ]
+}
+PLANK = {"name": "Plank", "muscleGroup": "", "sets": None}
+# coach.generate_workout_plan format: "sets" is a count, not a list
+AI_SQUAT = {"name": "Squat", "sets": 4, "reps": "8-10", "notes": "RPE 7"}
+# Hand-edited via PUT /api/workouts/{id}: non-numeric weight / reps, non-dict set
+MALFORMED = {
+    "name": "Dip",
+    "muscleGroup": "Chest",
+    "sets": [
+        {"weight": "", "reps": 10, "completed": True},
+        {"weight": "bodyweight", "reps": "12", "completed": True},
+        {"weight": 20, "reps": 6, "completed": "true"},
+        "warmup",
+    ]
+}
+
+
+def _daily(rows):
+    return pd.DataFrame(rows, columns=["day", "volume", "sets"])
+
+
+def _steady(as_of, days, volume=1000.0):
+    end = pd.Timestamp(as_of)
+    return [((end - pd.Timedelta(days=i)).strftime("%Y-%m-%d"), volume, 10) for i in range(0, days, 2)]
+
+
+def check_summarize_workout():
+    s = summarize_workout([BENCH, PULLUP, PLANK])
+    # Only completed sets; None / missing weight counts as 0
+    assert s["volume"] == 100 * 5 + 110 * 3 + 0 + 0 + 25, s
+    assert s["sets"] == 5, s
+    assert s["muscle_sets"] == {"Chest": 3, "Back": 2}, s
+    # e1RM: 110 x 3 -> 121, 100 x 5 -> 116.67 -> 117; 1 rep is the weight itself
+    assert s["exercise_bests"] == {
+        "Bench Press": {"weight": 110, "e1rm": 121},
+        "Pull Up": {"weight": 25, "e1rm": 25},
+    }, s
+    # Half-up rounding like the app: 45 x 5 = 52.5 -> 53
+    assert summarize_workout([{"name": "Row", "sets": [{"weight": 45, "reps": 5, "completed": True}]}])["exercise_bests"]["Row"]["e1rm"] == 53
+
+    # AI-format and malformed sets are skipped or count as 0, never raise
+    s = summarize_workout([AI_SQUAT, MALFORMED, "Plank"])
+    assert s == {"volume": 0.0, "sets": 2, "muscle_sets": {"Chest": 2}, "exercise_bests": {}}, s
+
+    empty = summarize_workout(None)
+    assert empty == {"volume": 0.0, "sets": 0, "muscle_sets": {}, "exercise_bests": {}}, empty
+
+
+def check_compute_training_load():
+    as_of = "2026-10-19"
+
+    load = compute_training_load(_daily([]), as_of)
+    assert load == {"acute_volume": 0.0, "chronic_volume": 0.0, "load_ratio": None, "weekly_sets": 0}, load
+
+    # Steady training every other day for 8 weeks -> ratio ~1
+    load = compute_training_load(_daily(_steady(as_of, 56)), as_of)
+    assert load["load_ratio"] is not None and 0.8 < load["load_ratio"] < 1.2, load
+
+    # Gaps between days are rest days, not missing data
+    rows = [("2026-08-01", 500.0, 5), ("2026-10-01", 1000.0, 10), ("2026-10-15", 3000.0, 12)]
+    load = compute_training_load(_daily(rows), as_of)
+    assert load["acute_volume"] == round(3000 / 7, 1), load
+    assert load["chronic_volume"] == round(4000 / 28, 1), load
+    assert load["load_ratio"] == 3.0, load
+    assert load["weekly_sets"] == 12, load
+
+    # One week of history only -> no ratio
+    load = compute_training_load(_daily(_steady(as_of, 7)), as_of)
+    assert load["load_ratio"] is None, load
+
+    # Back from a break: old history, nothing until this week -> no ratio
+    rows = _steady("2026-08-31", 28) + _steady(as_of, 7)
+    load = compute_training_load(_daily(rows), as_of)
+    assert load["load_ratio"] is None, load
+
+
+def check_add_training_columns():
+    logs = pd.DataFrame({"date": ["2026-10-17", "2026-10-18", "2026-10-19"], "hrv_rmssd_ms": [50, 55, 60]})
+    df = add_training_columns(logs, _daily([("2026-10-18", 2500.0, 15)]))
+    assert df["training_volume"].tolist() == [0, 2500, 0], df
+    assert df["training_sets"].tolist() == [0, 15, 0], df
+
+    df = add_training_columns(logs, _daily([]))
+    assert df["training_volume"].tolist() == [0, 0, 0], df
+
+
+def check_trigger(database_url):
+    import json
+    import psycopg2
+
+    conn = psycopg2.connect(database_url)
+    cur = conn.cursor()
+    cur.execute("create schema rollup_check")
+    cur.execute("set local search_path = rollup_check")
+    cur.execute("""
+        create table workouts (
+            id text primary key, user_id text, date timestamptz, exercises jsonb,
+            status text, is_template boolean default false
+        )
+    """)
+    # sync_workout_summary pins search_path to public; point it at the scratch schema
+    cur.execute(open(MIGRATION).read().replace("set search_path = public", "set search_path = rollup_check"))
+
+    workouts = {
+        "w1": [BENCH, PULLUP, PLANK],
+        "w2": [PULLUP],
+        "w3": [{"name": "Row", "muscleGroup": "Back", "sets": [{"weight": 45, "reps": 5, "completed": True}]}],
+        "w6": [AI_SQUAT, MALFORMED, "Plank"],
+    }
+    for workout_id, exercises in workouts.items():
+        cur.execute(
+            "insert into workouts values (%s, 'u1', '2026-10-18T09:30:00', %s, 'completed', false)",
+            (workout_id, json.dumps(exercises))
+        )
+    cur.execute("insert into workouts values ('w4', 'u1', '2026-10-18', '[]', 'suggested', false)")
+
+    # Evening workout in UTC-7 is the next UTC day, whatever the session timezone
+    cur.execute("set local timezone = 'America/Los_Angeles'")
+    cur.execute("update workouts set date = '2026-10-17T20:00:00-07:00' where id = 'w6'")
+
+    # Edit, template and delete should all be reflected without any API call
+    workouts["w2"] = [BENCH]
+    cur.execute("update workouts set exercises = %s where id = 'w2'", (json.dumps(workouts["w2"]),))
+    cur.execute("update workouts set is_template = true where id = 'w3'")
+    cur.execute("delete from workouts where id = 'w1'")
+    cur.execute("insert into workouts values ('w5', 'u1', '2026-10-19', %s, 'completed', false)", (json.dumps([PULLUP]),))
+    workouts["w5"] = [PULLUP]
+
+    cur.execute("select workout_id, day::text, volume, sets, muscle_sets, exercise_bests from workout_summaries")
+    rows = {r[0]: r[1:] for r in cur.fetchall()}
+    assert set(rows) == {"w2", "w5", "w6"}, rows
+    assert rows["w6"][0] == "2026-10-18", rows["w6"]
+
+    for workout_id in rows:
+        day, volume, sets, muscle_sets, exercise_bests = rows[workout_id]
+        expected = summarize_workout(workouts[workout_id])
+        assert math.isclose(volume, expected["volume"]) and sets == expected["sets"], (workout_id, rows[workout_id])
+        assert muscle_sets == expected["muscle_sets"], (workout_id, muscle_sets)
+        assert exercise_bests == expected["exercise_bests"], (workout_id, exercise_bests)
+
+    cur.execute("select day::text, volume, sets from workout_volume_daily order by day")
+    assert cur.fetchall() == [("2026-10-18", 830.0, 5), ("2026-10-19", 25.0, 2)]
+
+    conn.rollback()
+    conn.close()
+
+
+def main():
+    checks = [check_summarize_workout, check_compute_training_load, check_add_training_columns]
+    for check in checks:
+        check()
+        print(f"ok  {check.__name__}")
+
+    database_url = os.environ.get("DATABASE_URL")
+    if database_url:
+        check_trigger(database_url)
+        print("ok  check_trigger")
+    else:
+        print("skip check_trigger (DATABASE_URL not set)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+-- Personal baselines computed in the database.
+--
+-- Mirrors agents/mainapi.py compute_baseline: median HRV / RHR / sleep over
+-- each user's 14 most recent daily_logs rows. percentile_cont(0.5) interpolates
+-- between the two middle values like pandas' median and skips NULLs the same way.
+-- check_baselines.py compares both paths against a local Postgres.
+
+-- security_invoker so daily_logs RLS applies to whoever queries the view
+create or replace view baseline_stats with (security_invoker = true) as
+with recent as (
+    select
+        user_id,
+        hrv::float8       as hrv,
+        rhr::float8       as rhr,
+        sleep_hrs::float8 as sleep_hrs,
+        row_number() over (partition by user_id order by date desc) as rn
+    from daily_logs
+)
+select
+    user_id,
+    count(*)                                              as n_days,
+    percentile_cont(0.5) within group (order by hrv)       as avg_hrv,
+    percentile_cont(0.5) within group (order by rhr)       as avg_rhr,
+    percentile_cont(0.5) within group (order by sleep_hrs) as avg_sleep
+from recent
+where rn <= 14
+group by user_id;
+
+-- Recompute baselines for every user with at least 7 days of data in one pass.
+create or replace function refresh_baselines()
+returns integer
+language sql
+as $$
+    with upserted as (
+        insert into baselines (user_id, avg_hrv, avg_rhr, avg_sleep)
+        select user_id, avg_hrv, avg_rhr, avg_sleep
+        from baseline_stats
+        where n_days >= 7
+        on conflict (user_id) do update
+            set avg_hrv   = excluded.avg_hrv,
+                avg_rhr   = excluded.avg_rhr,
+                avg_sleep = excluded.avg_sleep
+        returning 1
+    )
+    select count(*)::integer from upserted;
+$$;
+
+-- Full-table recompute is for the backend (service role) only
+revoke execute on function refresh_baselines() from public, anon, authenticated;
+
+create index if not exists daily_logs_user_id_date_idx
+    on daily_logs (user_id, date desc);
@@ -0,0 +1,166 @@
+-- Workout volume rollups for the progress tab and training-load features.
+--
+-- workout_summaries holds one pre-parsed row per completed workout. It is kept
+-- up to date by a trigger on workouts, so workouts the app writes or deletes
+-- directly in Supabase are covered too. summarize_workout_exercises mirrors
+-- agents/training_load.py summarize_workout. The rollup views aggregate these
+-- small rows so nothing has to re-scan the exercises JSON on read.
+--
+-- day is the UTC calendar day of workouts.date. Neither the app
+-- (toISOString) nor the API stores the user's timezone, so a late-evening
+-- workout west of UTC lands on the next day relative to daily_logs.date.
+
+create table if not exists workout_summaries (
+    workout_id     text primary key references workouts(id) on delete cascade,
+    user_id        text not null,
+    day            date not null,
+    volume         float8 not null default 0,
+    sets           integer not null default 0,
+    muscle_sets    jsonb not null default '{}'::jsonb,
+    exercise_bests jsonb not null default '{}'::jsonb,
+    updated_at     timestamptz not null default now()
+);
+
+alter table workout_summaries enable row level security;
+
+create index if not exists workout_summaries_user_id_day_idx
+    on workout_summaries (user_id, day desc);
+
+-- Completed sets only: volume, set count, {muscleGroup: sets} and
+-- {exercise: {weight, e1rm}} (Epley, rounded half up like the app)
+create or replace function summarize_workout_exercises(exercises jsonb)
+returns table (volume float8, sets integer, muscle_sets jsonb, exercise_bests jsonb)
+language sql
+immutable
+as $$
+    with done as (
+        select
+            e ->> 'name'                          as name,
+            e ->> 'muscleGroup'                   as muscle,
+            -- Non-numeric weight / reps ("", "bodyweight") count as 0 instead of
+            -- failing the cast and aborting the workouts write
+            case when jsonb_typeof(s -> 'weight') = 'number' then (s ->> 'weight')::float8 else 0 end as weight,
+            case when jsonb_typeof(s -> 'reps') = 'number' then (s ->> 'reps')::float8 else 0 end     as reps
+        from jsonb_array_elements(
+            case when jsonb_typeof(exercises) = 'array' then exercises else '[]'::jsonb end
+        ) e
+        cross join lateral jsonb_array_elements(
+            case when jsonb_typeof(e -> 'sets') = 'array' then e -> 'sets' else '[]'::jsonb end
+        ) s
+        where jsonb_typeof(e) = 'object'
+          and jsonb_typeof(s) = 'object'
+          and s -> 'completed' = 'true'::jsonb
+    )
+    select
+        coalesce((select sum(weight * reps) from done), 0),
+        (select count(*)::integer from done),
+        coalesce((
+            select jsonb_object_agg(muscle, n)
+            from (
+                select muscle, count(*) as n
+                from done
+                where coalesce(muscle, '') <> ''
+                group by muscle
+            ) m
+        ), '{}'::jsonb),
+        coalesce((
+            select jsonb_object_agg(name, jsonb_build_object('weight', best_weight, 'e1rm', best_e1rm))
+            from (
+                select
+                    name,
+                    max(weight) as best_weight,
+                    max(case when reps <= 1 then weight
+                             else floor(weight * (1 + reps / 30) + 0.5) end) as best_e1rm
+                from done
+                where coalesce(name, '') <> '' and weight <> 0
+                group by name
+            ) b
+        ), '{}'::jsonb);
+$$;
+
+create or replace function sync_workout_summary()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op = 'DELETE' then
+        delete from workout_summaries where workout_id = old.id;
+        return old;
+    end if;
+
+    if new.status is distinct from 'completed' or coalesce(new.is_template, false) then
+        delete from workout_summaries where workout_id = new.id;
+        return new;
+    end if;
+
+    insert into workout_summaries
+        (workout_id, user_id, day, volume, sets, muscle_sets, exercise_bests, updated_at)
+    select new.id, new.user_id, (new.date::timestamptz at time zone 'utc')::date, s.volume, s.sets, s.muscle_sets, s.exercise_bests, now()
+    from summarize_workout_exercises(new.exercises::jsonb) s
+    on conflict (workout_id) do update
+        set user_id        = excluded.user_id,
+            day            = excluded.day,
+            volume         = excluded.volume,
+            sets           = excluded.sets,
+            muscle_sets    = excluded.muscle_sets,
+            exercise_bests = excluded.exercise_bests,
+            updated_at     = excluded.updated_at;
+    return new;
+end;
+$$;
+
+drop trigger if exists workouts_sync_summary on workouts;
+create trigger workouts_sync_summary
+    after insert or update or delete on workouts
+    for each row execute function sync_workout_summary();
+
+-- Backfill workouts saved before this migration
+insert into workout_summaries
+    (workout_id, user_id, day, volume, sets, muscle_sets, exercise_bests)
+select w.id, w.user_id, (w.date::timestamptz at time zone 'utc')::date, s.volume, s.sets, s.muscle_sets, s.exercise_bests
+from workouts w
+cross join lateral summarize_workout_exercises(w.exercises::jsonb) s
+where w.status = 'completed' and not coalesce(w.is_template, false)
+on conflict (workout_id) do nothing;
+
+create or replace view workout_volume_daily with (security_invoker = true) as
+select
+    user_id,
+    day,
+    count(*)    as workouts,
+    sum(volume) as volume,
+    sum(sets)   as sets
+from workout_summaries
+group by user_id, day;
+
+create or replace view workout_volume_weekly with (security_invoker = true) as
+select
+    user_id,
+    date_trunc('week', day)::date as week,
+    count(*)                      as workouts,
+    sum(volume)                   as volume,
+    sum(sets)                     as sets
+from workout_summaries
+group by user_id, date_trunc('week', day);
+
+create or replace view muscle_sets_weekly with (security_invoker = true) as
+select
+    s.user_id,
+    date_trunc('week', s.day)::date as week,
+    m.key                           as muscle_group,
+    sum(m.value::integer)           as sets
+from workout_summaries s
+cross join lateral jsonb_each_text(s.muscle_sets) m
+group by s.user_id, date_trunc('week', s.day), m.key;
+
+create or replace view exercise_bests with (security_invoker = true) as
+select
+    s.user_id,
+    e.key                                   as exercise,
+    max((e.value ->> 'weight')::float8)     as best_weight,
+    max((e.value ->> 'e1rm')::float8)       as best_e1rm
+from workout_summaries s
+cross join lateral jsonb_each(s.exercise_bests) e
+group by s.user_id, e.key;
@@ -0,0 +1,19 @@
+-- Streaming quantile sketches for population / personal percentiles.
+--
+-- One KLL sketch (agents/percentiles.py KLLSketch.to_dict) per cohort and
+-- metric. Cohorts are 'all' for the population and 'user:<user_id>' for a
+-- user's own history; sketch size stays bounded (~600 values) regardless of n.
+-- Ingest only writes 'user:<user_id>' rows; 'all' is rebuilt by merging them
+-- (POST /api/percentiles/merge, run on a schedule).
+
+create table if not exists metric_sketches (
+    cohort     text not null,
+    metric     text not null,
+    n          bigint not null default 0,
+    sketch     jsonb not null,
+    updated_at timestamptz not null default now(),
+    primary key (cohort, metric)
+);
+
+-- Personal rows hold a user's HRV / RHR / sleep distribution; backend only
+alter table metric_sketches enable row level security;